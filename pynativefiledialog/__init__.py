@@ -13,6 +13,7 @@ __all__ = ("FOS", "NativeFileDialog", "FileFilter", "CommonFilters")
 
 import ctypes
 import os
+import re
 import sys
 from ctypes import (
     c_void_p,
@@ -22,13 +23,17 @@ from ctypes import (
     byref,
     sizeof,
     cast,
+    create_unicode_buffer,
     POINTER,
     WINFUNCTYPE,
+    wstring_at,
 )
 from ctypes.wintypes import DWORD, HWND, UINT, LPWSTR
 from collections.abc import Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum, IntFlag
+from functools import lru_cache
+from types import MappingProxyType
 from uuid import UUID
 from typing import Iterable, List, Optional, Tuple, overload, Literal
 
@@ -48,9 +53,17 @@ if sys.getwindowsversion().major < 6:
 
 HRESULT = c_long
 ERROR_CANCELLED = 0x800704C7
+HRESULT_CANCELLED = HRESULT(ERROR_CANCELLED).value  # signed, as returned by COM calls
 CLSCTX_INPROC_SERVER = 0x1
+COINIT_APARTMENTTHREADED = 0x2
+RPC_E_CHANGED_MODE = HRESULT(0x80010106).value
 SIGDN_FILESYSPATH = DWORD(0x80058000)
 
+# Options a new dialog starts with, indexed by save mode (see IFileDialog::GetOptions):
+#   open: PATHMUSTEXIST | FILEMUSTEXIST | NOCHANGEDIR
+#   save: OVERWRITEPROMPT | NOREADONLYRETURN | PATHMUSTEXIST | NOCHANGEDIR
+FOS_DEFAULTS = (0x1808, 0x880A)
+
 # ---------------------------------------------------------------------------
 # Internal COM pointer helpers
 # ---------------------------------------------------------------------------
@@ -67,7 +80,7 @@ shell32 = ctypes.windll.shell32
 
 CoCreateInstance = ole32.CoCreateInstance
 CoTaskMemFree = ole32.CoTaskMemFree
-CoInitialize = ole32.CoInitialize
+CoInitializeEx = ole32.CoInitializeEx
 CoUninitialize = ole32.CoUninitialize
 SHCreateItemFromParsingName = shell32.SHCreateItemFromParsingName
 
@@ -76,6 +89,13 @@ SHCreateItemFromParsingName = shell32.SHCreateItemFromParsingName
 # File filters
 # ---------------------------------------------------------------------------
 
+# Extensions treated as "match everything"
+_EXT_SPECIALS = frozenset(("", "*", ".", "*.*"))
+
+# Plain extensions such as "png", ".png" or "*.png"
+_EXT_FAST = re.compile(r"(?:\*?\.)?([A-Za-z0-9]+)")
+
+
 @dataclass(slots=True)
 class FileFilter:
     """
@@ -87,6 +107,9 @@ class FileFilter:
 
     label: str
     _extensions: Tuple[str, ...]
+    _pattern: str = field(repr=False, compare=False)
+    _suffixes: Tuple[str, ...] = field(repr=False, compare=False)
+    _is_wildcard: bool = field(repr=False, compare=False)
 
     def __init__(self, label: str, extensions: Iterable[str] = ()):
         self.label = label
@@ -100,23 +123,23 @@ class FileFilter:
 
     @extensions.setter
     def extensions(self, values: Iterable[str]):
-        self._extensions = tuple(self._normalize(v) for v in values)
+        (
+            self._extensions, self._pattern, self._suffixes, self._is_wildcard
+        ) = self._intern_extensions(tuple(values))
         self.label = self._normalize_label(self.label, self._extensions)
 
     @property
     def pattern(self) -> str:
         """Return Windows-compatible filter pattern."""
-        return "*.*" if not self._extensions else ";".join(self._extensions)
+        return self._pattern
 
     def matches(self, path: str) -> bool:
         """Check whether the given path matches the filter."""
-        if not self._extensions or "*.*" in self._extensions:
-            return True
-        return path.lower().endswith(tuple(ext.lstrip("*") for ext in self._extensions))
+        return self._is_wildcard or path.lower().endswith(self._suffixes)
 
     def normalize_extension(self, path: str) -> str:
         """Append default extension if missing."""
-        return path if self.matches(path) else path + self._extensions[0].lstrip("*")
+        return path if self.matches(path) else path + self._suffixes[0]
 
     @classmethod
     def validate(cls, filters: Sequence[Tuple[str, str]]) -> List["FileFilter"]:
@@ -128,25 +151,51 @@ class FileFilter:
         """Prepare filters for Windows dialog APIs."""
         return tuple((f.label, f.pattern) for f in filetypes if isinstance(f, FileFilter))
 
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _wide_strings(label: str, pattern: str) -> Tuple[LPWSTR, LPWSTR]:
+        """Return reusable wide-string pointers for a prepared (label, pattern) pair."""
+        return cast(create_unicode_buffer(label), LPWSTR), cast(create_unicode_buffer(pattern), LPWSTR)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _intern_extensions(values: Tuple[str, ...]) -> Tuple[Tuple[str, ...], str, Tuple[str, ...], bool]:
+        """
+        Normalize extensions once per distinct input, shared between equal filters.
+
+        Returns (extensions, pattern, suffixes, is_wildcard), where suffixes are
+        the endings checked by `matches`, e.g. ".png".
+        """
+        extensions = tuple([FileFilter._normalize(v) for v in values])
+        return (
+            extensions,
+            "*.*" if not extensions else ";".join(extensions),
+            tuple([ext.lstrip("*") for ext in extensions if ext != "*.*"]),
+            not extensions or "*.*" in extensions,
+        )
+
     @staticmethod
     def _normalize(ext: str) -> str:
         """Normalize a single file extension."""
-        if not ext or ext in ("*", ".", "*.*"):
-            ext = "*.*"
-        else:
-            if ext.endswith("."):
-                ext += "*"
-            if ext.startswith("."):
-                ext = "*" + ext
-            if not ext.startswith("*"):
-                ext = "*." + ext
+        if ext in _EXT_SPECIALS:
+            return "*.*"
+        if m := _EXT_FAST.fullmatch(ext):
+            return "*." + m.group(1)
+
+        # Slow path for unusual inputs ("tar.", "*g", ...)
+        if ext.endswith("."):
+            ext += "*"
+        if ext.startswith("."):
+            ext = "*" + ext
+        if not ext.startswith("*"):
+            ext = "*." + ext
         return ext
 
     @staticmethod
     def _normalize_label(label: str, extensions: tuple) -> str:
         """ Build a user-facing label based on extensions: "<label> (png, jpg)"."""
         if extensions and "*.*" not in extensions:
-            cleaned = (ext.lstrip("*.") for ext in extensions)
+            cleaned = [ext.lstrip("*.") for ext in extensions]
             label = f"{label} ({', '.join(cleaned)})"
         return label
 
@@ -241,10 +290,15 @@ class CommonFilters(Enum):
         Example usage:
             CommonFilters.PDF.filter
         """
-        if not hasattr(self, "_filter"):
+        f = _FILTER_CACHE.get(self)
+        if f is None:
             label, ext = self.value
-            object.__setattr__(self, "_filter", FileFilter(label, ext))
-        return object.__getattribute__(self, "_filter")
+            f = _FILTER_CACHE[self] = FileFilter(label, ext)
+        return f
+
+
+# FileFilter objects created by CommonFilters.filter
+_FILTER_CACHE: dict[CommonFilters, FileFilter] = {}
 
 
 # ---------------------------------------------------------------------------
@@ -263,13 +317,16 @@ class GUID(ctypes.Structure):
         ("Data4", c_ubyte * 8),
     )
 
-    def __init__(self, value: str | UUID):
+    def __init__(self, value: str | UUID | bytes):
         super().__init__()
-        u = value if isinstance(value, UUID) else UUID(value)
-        self.Data1 = u.time_low
-        self.Data2 = u.time_mid
-        self.Data3 = u.time_hi_version
-        self.Data4[:] = u.bytes[8:]
+        # GUID memory layout matches UUID.bytes_le, so copy it in one go
+        if isinstance(value, str):
+            value = UUID(value).bytes_le
+        elif isinstance(value, UUID):
+            value = value.bytes_le
+        if len(value) != sizeof(self):
+            raise ValueError("GUID requires exactly 16 bytes")
+        ctypes.memmove(byref(self), value, sizeof(self))
 
 
 class _FileDialogGUIDs:
@@ -284,6 +341,12 @@ class _FileDialogGUIDs:
     IID_IFileSaveDialog = GUID("{84BCCD23-5FDE-4CDB-AEA4-AF64B83D78AB}")
     IID_IShellItem = GUID("{43826D1E-E718-42EE-BC55-A1E261C37BFE}")
 
+    # (CLSID, IID) of the dialog object, indexed by save mode
+    DIALOGS = (
+        (CLSID_FileOpenDialog, IID_IFileOpenDialog),
+        (CLSID_FileSaveDialog, IID_IFileSaveDialog),
+    )
+
 
 # ---------------------------------------------------------------------------
 # COM VTable helpers
@@ -310,18 +373,28 @@ class VTableFunc:
         "SetFnLabel": (19, (LPWSTR,)),
         "GetResult": (20, (POINTER(c_mem_p),)),
         "GetResults": (27, (POINTER(c_mem_p),)),
-        "GetName": (5, (DWORD, POINTER(LPWSTR))),
+        "GetName": (5, (DWORD, POINTER(c_void_p))),
         "GetCount": (7, (POINTER(DWORD),)),
         "GetItemAt": (8, (DWORD, POINTER(c_mem_p))),
         "Release": (2, ()),
     }
+    # Read-only, with interned names so cache keys hash and compare by identity
+    FUNCS = MappingProxyType({sys.intern(name): entry for name, entry in FUNCS.items()})
+
+    # Function prototypes are built once instead of on every lookup
+    _FN_TYPES = {name: WINFUNCTYPE(HRESULT, c_mem_p, *args) for name, (_, args) in FUNCS.items()}
 
     @classmethod
     def cast(cls, com_obj, name: str):
         """Return a callable COM method from the vtable."""
-        index, args = cls.FUNCS[name]
-        fn_type = WINFUNCTYPE(HRESULT, c_mem_p, *args)
-        return cast(com_obj.contents.value + index * PSIZE, POINTER(fn_type)).contents
+        return cls._resolve(com_obj.contents.value, name)
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _resolve(vtable: int, name: str):
+        """Resolve a vtable slot, cached per (vtable pointer, method name)."""
+        index, _ = VTableFunc.FUNCS[name]
+        return cast(vtable + index * PSIZE, POINTER(VTableFunc._FN_TYPES[name])).contents
 
     @classmethod
     def free(cls, *com_obj):
@@ -412,155 +485,122 @@ class NativeFileDialog:
         # HWND to attach the dialog to (0 = no owner window)
         window_id: int = 0
 
-        flags = DWORD()
         COM, DIR, item, mult = c_mem_p(), c_mem_p(), c_mem_p(), c_mem_p()
 
         paths: List[str] = []
         initialized = False
 
         try:
-            # Initialize COM for the current thread
-            if CoInitialize(None) < 0:
-                raise OSError("CoInitialize failed")
-
-            initialized = True
+            # Initialize COM for the current thread. S_OK and S_FALSE both need a matching
+            # CoUninitialize; RPC_E_CHANGED_MODE means the caller already set up COM here.
+            hr = CoInitializeEx(None, COINIT_APARTMENTTHREADED)
+            if hr >= 0:
+                initialized = True
+            elif hr != RPC_E_CHANGED_MODE:
+                raise OSError("CoInitializeEx failed")
 
             # Create File Open or File Save dialog COM object
+            clsid, iid = _FileDialogGUIDs.DIALOGS[bool(save_mode)]
             if (
-                    CoCreateInstance(
-                        byref(
-                            _FileDialogGUIDs.CLSID_FileSaveDialog
-                            if save_mode
-                            else _FileDialogGUIDs.CLSID_FileOpenDialog
-                        ),
-                        None,
-                        CLSCTX_INPROC_SERVER,
-                        byref(
-                            _FileDialogGUIDs.IID_IFileSaveDialog
-                            if save_mode
-                            else _FileDialogGUIDs.IID_IFileOpenDialog
-                        ),
-                        byref(COM),
-                    ) < 0
+                    CoCreateInstance(byref(clsid), None, CLSCTX_INPROC_SERVER, byref(iid), byref(COM)) < 0
                     or VTableFunc.is_null_ptr(COM)
             ):
                 raise OSError("CoCreateInstance failed")
 
-            # Resolve required COM vtable functions
+            # Resolve COM vtable functions used by every mode; mode-specific ones
+            # are resolved only in the branch that needs them
             Show = VTableFunc.cast(COM, "Show")
-            SetFileType = VTableFunc.cast(COM, "SetFileType")
-            SetFileTypeIdx = VTableFunc.cast(COM, "SetFileTypeIdx")
-            GetFileTypeIdx = VTableFunc.cast(COM, "GetFileTypeIdx")
             SetOptions = VTableFunc.cast(COM, "SetOptions")
-            GetOptions = VTableFunc.cast(COM, "GetOptions")
-            SetFolder = VTableFunc.cast(COM, "SetFolder")
-            SetFileName = VTableFunc.cast(COM, "SetFileName")
-            SetTitle = VTableFunc.cast(COM, "SetTitle")
-            SetOkBtnTxt = VTableFunc.cast(COM, "SetOkBtnTxt")
-            SetFnLabel = VTableFunc.cast(COM, "SetFnLabel")
-            GetResult = VTableFunc.cast(COM, "GetResult")
-            GetResults = VTableFunc.cast(COM, "GetResults")
-
-            # Configure dialog flags
-            GetOptions(COM, byref(flags))
-            flags.value |= (
-                    FOS.FORCEFILESYSTEM
-                    | FOS.PATHMUSTEXIST
-                    | FOS.FILEMUSTEXIST
-                    | (bool(multichoice) and FOS.ALLOWMULTISELECT)
-                    | add_flags
+
+            # Configure dialog flags on top of the known defaults (no GetOptions round-trip)
+            flags = (
+                    FOS_DEFAULTS[bool(save_mode)]
+                    | _BASE_FLAGS
+                    | (-bool(multichoice) & _FOS_ALLOWMULTISELECT)
+                    | int(add_flags)
             )
             SetOptions(COM, flags)
 
-            # Configure file type filters
+            # Configure file type filters (kept indexable by file type index)
+            file_type_filters = tuple(f for f in file_type_filters if isinstance(f, FileFilter))
             if prepared_filters := FileFilter.prepare(file_type_filters):
-                SetFileType(
-                    COM,
-                    len(prepared_filters),
-                    (LPWSTR * 2 * len(prepared_filters))(
-                        *[tuple(LPWSTR(i) for i in j) for j in prepared_filters]
-                    ),
-                )
-                SetFileTypeIdx(COM, 1)
+                filter_specs = (LPWSTR * 2 * len(prepared_filters))()
+                for spec, (label, pattern) in zip(filter_specs, prepared_filters):
+                    spec[0], spec[1] = FileFilter._wide_strings(label, pattern)
+                VTableFunc.cast(COM, "SetFileType")(COM, len(prepared_filters), filter_specs)
+                VTableFunc.cast(COM, "SetFileTypeIdx")(COM, 1)
 
             # Optional dialog customization
             if title:
-                SetTitle(COM, LPWSTR(title))
+                VTableFunc.cast(COM, "SetTitle")(COM, title)
             if init_file:
-                SetFileName(COM, LPWSTR(init_file))
+                VTableFunc.cast(COM, "SetFileName")(COM, init_file)
             if confirm_button_label:
-                SetOkBtnTxt(COM, LPWSTR(confirm_button_label))
+                VTableFunc.cast(COM, "SetOkBtnTxt")(COM, confirm_button_label)
             if input_label:
-                SetFnLabel(COM, LPWSTR(input_label))
+                VTableFunc.cast(COM, "SetFnLabel")(COM, input_label)
 
             # Set initial directory if provided
             if (init_dir and
                     SHCreateItemFromParsingName(
-                        LPWSTR(init_dir), None, byref(_FileDialogGUIDs.IID_IShellItem), byref(DIR)
+                        init_dir, None, byref(_FileDialogGUIDs.IID_IShellItem), byref(DIR)
                     ) >= 0):
-                SetFolder(COM, DIR)
+                VTableFunc.cast(COM, "SetFolder")(COM, DIR)
 
             # Show the dialog
-            hr = Show(COM, HWND(window_id))
+            hr = Show(COM, window_id)
 
-            if hr != ctypes.c_long(ERROR_CANCELLED).value:
+            if hr != HRESULT_CANCELLED:
                 if hr < 0:
                     raise OSError(f"Dialog failed with HRESULT {hr:#x}")
 
-                # Retrieve result(s)
-                path = LPWSTR()
+                # Retrieve result(s); names are read straight from the CoTaskMem buffer
+                path = c_void_p()
 
                 if save_mode:
                     # Single file result (Save dialog)
-                    if GetResult(COM, byref(item)) >= 0:
+                    if VTableFunc.cast(COM, "GetResult")(COM, byref(item)) >= 0:
+                        # The item itself is released in the finally block
                         GetName = VTableFunc.cast(item, "GetName")
-                        Release = VTableFunc.cast(item, "Release")
-
-                        if GetName(item, SIGDN_FILESYSPATH, byref(path)) >= (
-                                Release(item) and 0
-                        ):
-                            GetFileTypeIdx(COM, byref(filetypeidx := UINT()))
-                            try:
-                                raw_filter = prepared_filters[filetypeidx.value - 1]
-                                ff = FileFilter.validate((raw_filter,))[0]
-                                paths.append(ff.normalize_extension(path.value))
-                            except (IndexError, TypeError, AttributeError):
-                                paths.append(path.value)
 
+                        if GetName(item, SIGDN_FILESYSPATH, byref(path)) >= 0:
+                            name = wstring_at(path.value)
                             CoTaskMemFree(path)
 
+                            VTableFunc.cast(COM, "GetFileTypeIdx")(COM, byref(filetypeidx := UINT()))
+                            try:
+                                ff = file_type_filters[filetypeidx.value - 1]
+                                paths.append(ff.normalize_extension(name))
+                            except IndexError:
+                                paths.append(name)
+
                 else:
                     # File Open dialog (single or multi-selection)
-                    if GetResults(COM, byref(mult)) >= 0:
+                    if VTableFunc.cast(COM, "GetResults")(COM, byref(mult)) >= 0:
                         GetCount = VTableFunc.cast(mult, "GetCount")
                         GetItemAt = VTableFunc.cast(mult, "GetItemAt")
 
                         pathsnum = DWORD()
                         if GetCount(mult, byref(pathsnum)) >= 0:
+                            vtable = None
                             for i in range(pathsnum.value):
                                 if GetItemAt(mult, i, byref(item)) < 0:
                                     break
 
-                                # Resolve per-item methods lazily
-                                GetName = cast(
-                                    item.contents.value + 5 * PSIZE,
-                                    POINTER(
-                                        WINFUNCTYPE(
-                                            HRESULT, c_mem_p, DWORD, POINTER(LPWSTR)
-                                        )
-                                    ),
-                                ).contents
-                                Release = cast(
-                                    item.contents.value + 2 * PSIZE,
-                                    POINTER(WINFUNCTYPE(HRESULT, c_mem_p)),
-                                ).contents
-
-                                if GetName(item, SIGDN_FILESYSPATH, byref(path)) < (
-                                        Release(item) and 0
-                                ):
+                                # Items normally share one vtable; re-resolve only when it changes
+                                if item.contents.value != vtable:
+                                    vtable = item.contents.value
+                                    GetName = VTableFunc.cast(item, "GetName")
+                                    Release = VTableFunc.cast(item, "Release")
+
+                                hr = GetName(item, SIGDN_FILESYSPATH, byref(path))
+                                Release(item)
+                                # Drop the released pointer so the finally block skips it
+                                item = c_mem_p()
+                                if hr < 0:
                                     break
 
-                                paths.append(path.value)
+                                paths.append(wstring_at(path.value))
                                 CoTaskMemFree(path)
 
         finally:
@@ -599,7 +639,7 @@ class NativeFileDialog:
             init_dir=init_dir,
             confirm_button_label=confirm_button_label,
             input_label=input_label,
-            add_flags=FOS.PICKFOLDERS | flags,
+            add_flags=_FOS_I["PICKFOLDERS"] | flags,
         )
 
     @classmethod
@@ -691,7 +731,7 @@ class NativeFileDialog:
             init_file=init_file,
             confirm_button_label=confirm_button_label,
             input_label=input_label,
-            add_flags=(bool(file_type_filters) and FOS.STRICTFILETYPES) | flags,
+            add_flags=(-bool(file_type_filters) & _FOS_STRICTFILETYPES) | flags,
             file_type_filters=file_type_filters,
             save_mode=True,
         )
@@ -732,3 +772,13 @@ class FOS(IntFlag):
     DEFAULTNOMINIMODE = 0x20000000
     FORCEPREVIEWPANEON = 0x40000000
     SUPPORTSTREAMABLEITEMS = 0x80000000
+
+
+# Plain-int copies of FOS members, so the dialog flags path creates no IntFlag instances
+_FOS_I = {name: int(member) for name, member in FOS.__members__.items()}
+_BASE_FLAGS = _FOS_I["FORCEFILESYSTEM"] | _FOS_I["PATHMUSTEXIST"] | _FOS_I["FILEMUSTEXIST"]
+
+# Masks for conditional options: -bool(x) is -1 (all bits) or 0,
+# so "-bool(x) & mask" selects the mask without a branch
+_FOS_ALLOWMULTISELECT = _FOS_I["ALLOWMULTISELECT"]
+_FOS_STRICTFILETYPES = _FOS_I["STRICTFILETYPES"]